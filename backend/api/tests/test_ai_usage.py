@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import json
 from datetime import timedelta
 from unittest.mock import Mock, patch
 
@@ -8,6 +9,7 @@ from django.utils import timezone
 from rest_framework.test import APIClient
 
 from api.models import AiUsageEvent, Profile, Subscription
+from api.tools.auth.authentication import ClerkPrincipal
 from api.tools.auth.clerk import ClerkClientError
 
 
@@ -18,16 +20,60 @@ from api.tools.auth.clerk import ClerkClientError
     AI_DEFAULT_CHAT_MODEL="gpt-3.5-turbo",
 )
 class AiUsageApiTests(TestCase):
-    def setUp(self):
-        self.client = APIClient()
-        self.auth_headers = {"HTTP_AUTHORIZATION": "Bearer unit-test-token"}
-        self.claims = {
+    client_class = APIClient
+    chat_hello_body = json.dumps(
+        {
+            "provider": "simulator",
+            "model": "gpt-3.5-turbo",
+            "max_output_tokens": 8,
+            "messages": [{"role": "user", "content": "hello"}],
+        }
+    ).encode()
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.default_clerk_client = Mock()
+        cls.default_clerk_client.users.get_billing_subscription.return_value = {
+            "data": {
+                "id": "ai_user_1",
+                "billing": {"subscription": None},
+            }
+        }
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.claims = {
             "sub": "ai_user_1",
             "email": "ai-user@example.com",
             "given_name": "Ai",
             "family_name": "User",
             "entitlements": ["free"],
         }
+        cls.profile = Profile.objects.create(
+            clerk_user_id="ai_user_1",
+            email="ai-user@example.com",
+            first_name="Ai",
+            last_name="User",
+            plan_tier=Profile.PlanTier.FREE,
+            billing_features=["free"],
+        )
+        cls.now = timezone.now()
+        cls.period_start = cls.now - timedelta(days=3)
+        cls.period_end = cls.now + timedelta(days=27)
+        cls.period_start_iso = cls.period_start.isoformat()
+        cls.period_end_iso = cls.period_end.isoformat()
+
+    def setUp(self):
+        self.client.force_authenticate(
+            user=ClerkPrincipal(clerk_user_id=self.profile.clerk_user_id, claims=self.claims),
+            token=self.claims,
+        )
+
+        clerk_client_patcher = patch("api.views_modules.account.get_clerk_client")
+        self.mock_get_clerk_client = clerk_client_patcher.start()
+        self.addCleanup(clerk_client_patcher.stop)
+        self.default_clerk_client.reset_mock()
 
     def _request(
         self,
@@ -35,25 +81,24 @@ class AiUsageApiTests(TestCase):
         path: str,
         data=None,
         *,
+        raw_body: bytes | None = None,
         billing_error: Exception | None = None,
         billing_response: dict | None = None,
     ):
-        with patch("api.tools.auth.authentication.decode_clerk_token", return_value=self.claims), patch(
-            "api.views_modules.account.get_clerk_client"
-        ) as mock_get_clerk_client:
-            if billing_error is not None:
-                mock_get_clerk_client.side_effect = billing_error
-            else:
-                mock_client = Mock()
-                mock_client.users.get_billing_subscription.return_value = billing_response or {
-                    "data": {
-                        "id": "ai_user_1",
-                        "billing": {"subscription": None},
-                    }
-                }
-                mock_get_clerk_client.return_value = mock_client
-            handler = getattr(self.client, method)
-            return handler(path, data=data, format="json", **self.auth_headers)
+        if billing_error is not None:
+            self.mock_get_clerk_client.side_effect = billing_error
+        elif billing_response is not None:
+            mock_client = Mock()
+            mock_client.users.get_billing_subscription.return_value = billing_response
+            self.mock_get_clerk_client.side_effect = None
+            self.mock_get_clerk_client.return_value = mock_client
+        else:
+            self.mock_get_clerk_client.side_effect = None
+            self.mock_get_clerk_client.return_value = self.default_clerk_client
+        handler = getattr(self.client, method)
+        if raw_body is not None:
+            return handler(path, data=raw_body, content_type="application/json")
+        return handler(path, data=data, format="json")
 
     def test_token_estimate_endpoint_returns_nonzero_total(self):
         response = self._request(
@@ -73,12 +118,7 @@ class AiUsageApiTests(TestCase):
         first_response = self._request(
             "post",
             "/api/ai/chat/complete/",
-            {
-                "provider": "simulator",
-                "model": "gpt-3.5-turbo",
-                "max_output_tokens": 8,
-                "messages": [{"role": "user", "content": "hello"}],
-            },
+            raw_body=self.chat_hello_body,
         )
         self.assertEqual(first_response.status_code, 200)
         self.assertEqual(AiUsageEvent.objects.filter(metric="tokens").count(), 2)
@@ -103,12 +143,11 @@ class AiUsageApiTests(TestCase):
     )
     def test_chat_allows_soft_stale_billing_state_with_warning(self):
         self._request("get", "/api/me/")
-        profile = Profile.objects.get(clerk_user_id="ai_user_1")
-        account = profile.customer_account
+        account = self.profile.customer_account
         account.metadata = {
             "billing_sync": {
-                "last_success_at": (timezone.now() - timedelta(minutes=30)).isoformat(),
-                "last_attempt_at": timezone.now().isoformat(),
+                "last_success_at": (self.now - timedelta(minutes=30)).isoformat(),
+                "last_attempt_at": self.now.isoformat(),
                 "last_attempt_succeeded": True,
                 "last_reason_code": "synced",
                 "last_error_code": "",
@@ -119,12 +158,7 @@ class AiUsageApiTests(TestCase):
         response = self._request(
             "post",
             "/api/ai/chat/complete/",
-            {
-                "provider": "simulator",
-                "model": "gpt-3.5-turbo",
-                "max_output_tokens": 8,
-                "messages": [{"role": "user", "content": "hello"}],
-            },
+            raw_body=self.chat_hello_body,
             billing_error=ClerkClientError("client-unavailable"),
         )
         self.assertEqual(response.status_code, 200)
@@ -140,12 +174,7 @@ class AiUsageApiTests(TestCase):
         response = self._request(
             "post",
             "/api/ai/chat/complete/",
-            {
-                "provider": "simulator",
-                "model": "gpt-3.5-turbo",
-                "max_output_tokens": 8,
-                "messages": [{"role": "user", "content": "hello"}],
-            },
+            raw_body=self.chat_hello_body,
             billing_error=ClerkClientError("client-unavailable"),
         )
         self.assertEqual(response.status_code, 503)
@@ -182,16 +211,12 @@ class AiUsageApiTests(TestCase):
 
     def test_usage_summary_uses_subscription_cycle_window(self):
         self._request("get", "/api/me/")
-        profile = Profile.objects.get(clerk_user_id="ai_user_1")
-        account = profile.customer_account
-        now = timezone.now()
-        period_start = now - timedelta(days=3)
-        period_end = now + timedelta(days=27)
+        account = self.profile.customer_account
         Subscription.objects.create(
             customer_account=account,
             status=Subscription.Status.ACTIVE,
-            current_period_start=period_start,
-            current_period_end=period_end,
+            current_period_start=self.period_start,
+            current_period_end=self.period_end,
         )
 
         in_cycle_event = AiUsageEvent.objects.create(
@@ -201,8 +226,8 @@ class AiUsageApiTests(TestCase):
             amount=111,
             provider="simulator",
             model_name="gpt-3.5-turbo",
-            period_start=period_start,
-            period_end=period_end,
+            period_start=self.period_start,
+            period_end=self.period_end,
         )
         out_of_cycle_event = AiUsageEvent.objects.create(
             customer_account=account,
@@ -211,11 +236,11 @@ class AiUsageApiTests(TestCase):
             amount=999,
             provider="simulator",
             model_name="gpt-3.5-turbo",
-            period_start=period_start - timedelta(days=30),
-            period_end=period_end - timedelta(days=30),
+            period_start=self.period_start - timedelta(days=30),
+            period_end=self.period_end - timedelta(days=30),
         )
-        AiUsageEvent.objects.filter(pk=in_cycle_event.pk).update(created_at=now - timedelta(hours=2))
-        AiUsageEvent.objects.filter(pk=out_of_cycle_event.pk).update(created_at=now - timedelta(days=45))
+        AiUsageEvent.objects.filter(pk=in_cycle_event.pk).update(created_at=self.now - timedelta(hours=2))
+        AiUsageEvent.objects.filter(pk=out_of_cycle_event.pk).update(created_at=self.now - timedelta(days=45))
 
         response = self._request(
             "get",
@@ -227,8 +252,8 @@ class AiUsageApiTests(TestCase):
                         "subscription": {
                             "id": "sub_usage_summary_1",
                             "status": "active",
-                            "current_period_start": period_start.isoformat(),
-                            "current_period_end": period_end.isoformat(),
+                            "current_period_start": self.period_start_iso,
+                            "current_period_end": self.period_end_iso,
                             "cancel_at_period_end": False,
                         }
                     },
@@ -1,3 +1,4 @@
+import logging
 from unittest.mock import patch
 
 from django.test import SimpleTestCase, override_settings
@@ -10,10 +11,20 @@ from api.tools.database.supabase import _ensure_https
 from api.views import extract_billing_features
 
 
+def setUpModule():
+    logging.disable(logging.CRITICAL)
+
+
+def tearDownModule():
+    logging.disable(logging.NOTSET)
+
+
 class ClerkJWTAuthenticationTests(SimpleTestCase):
-    def setUp(self):
-        self.factory = APIRequestFactory(enforce_csrf_checks=True)
-        self.authentication = ClerkJWTAuthentication()
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.factory = APIRequestFactory(enforce_csrf_checks=True)
+        cls.authentication = ClerkJWTAuthentication()
 
     def test_returns_none_without_token(self):
         request = self.factory.get("/api/me/")
@@ -76,79 +87,46 @@ class ClerkJWTAuthenticationTests(SimpleTestCase):
             self.authentication.authenticate(request)
 
 
+@override_settings(CLERK_BILLING_CLAIM="entitlements")
 class BillingFeaturesTests(SimpleTestCase):
-    @override_settings(CLERK_BILLING_CLAIM="entitlements")
-    def test_extracts_features_from_list(self):
-        claims = {"entitlements": ["pro", "analytics"]}
-        self.assertEqual(extract_billing_features(claims), ["pro", "analytics"])
-
-    @override_settings(CLERK_BILLING_CLAIM="entitlements")
-    def test_extracts_features_from_dictionary(self):
-        claims = {"entitlements": {"pro": True, "team": False, "reports": 1}}
-        self.assertEqual(extract_billing_features(claims), ["pro", "reports"])
-
-    @override_settings(CLERK_BILLING_CLAIM="entitlements")
-    def test_extracts_features_from_csv_string(self):
-        claims = {"entitlements": "pro, analytics , team"}
-        self.assertEqual(extract_billing_features(claims), ["pro", "analytics", "team"])
-
-    @override_settings(CLERK_BILLING_CLAIM="entitlements")
-    def test_normalizes_and_deduplicates_features(self):
-        claims = {"entitlements": [" Pro ", "pro", "ANALYTICS", "analytics"]}
-        self.assertEqual(extract_billing_features(claims), ["pro", "analytics"])
+    def test_extracts_billing_features(self):
+        cases = [
+            ("list", {"entitlements": ["pro", "analytics"]}, ["pro", "analytics"]),
+            ("dictionary", {"entitlements": {"pro": True, "team": False, "reports": 1}}, ["pro", "reports"]),
+            ("csv_string", {"entitlements": "pro, analytics , team"}, ["pro", "analytics", "team"]),
+            (
+                "normalized_and_deduplicated",
+                {"entitlements": [" Pro ", "pro", "ANALYTICS", "analytics"]},
+                ["pro", "analytics"],
+            ),
+        ]
+        for label, claims, expected in cases:
+            with self.subTest(label):
+                self.assertEqual(extract_billing_features(claims), expected)
 
 
 class AuthorizedPartiesTests(SimpleTestCase):
-    def test_matches_exact_origin(self):
-        self.assertTrue(
-            authorized_party_matches(
-                "http://localhost:5173",
-                ["http://localhost:5173"],
-            )
-        )
-
-    def test_matches_with_trailing_slash(self):
-        self.assertTrue(
-            authorized_party_matches(
-                "http://localhost:5173",
-                ["http://localhost:5173/"],
-            )
-        )
-
-    def test_matches_loopback_aliases(self):
-        self.assertTrue(
-            authorized_party_matches(
-                "http://127.0.0.1:5173",
-                ["http://localhost:5173"],
-            )
-        )
-
-    def test_rejects_different_ports(self):
-        self.assertFalse(
-            authorized_party_matches(
-                "http://127.0.0.1:5173",
-                ["http://localhost:3000"],
-            )
-        )
-
-    def test_rejects_unlisted_non_loopback_host(self):
-        self.assertFalse(
-            authorized_party_matches(
-                "https://app.example.com",
-                ["https://admin.example.com"],
-            )
-        )
+    def test_authorized_party_matching(self):
+        cases = [
+            ("exact_origin", "http://localhost:5173", ["http://localhost:5173"], True),
+            ("trailing_slash", "http://localhost:5173", ["http://localhost:5173/"], True),
+            ("loopback_alias", "http://127.0.0.1:5173", ["http://localhost:5173"], True),
+            ("different_port", "http://127.0.0.1:5173", ["http://localhost:3000"], False),
+            ("unlisted_non_loopback_host", "https://app.example.com", ["https://admin.example.com"], False),
+        ]
+        for label, azp, allowed_parties, expected in cases:
+            with self.subTest(label):
+                self.assertIs(authorized_party_matches(azp, allowed_parties), expected)
 
 
 class SupabaseUrlTests(SimpleTestCase):
-    def test_adds_https_prefix(self):
-        self.assertEqual(_ensure_https("db.example.supabase.co"), "https://db.example.supabase.co")
-
-    def test_preserves_existing_https(self):
-        self.assertEqual(_ensure_https("https://db.example.supabase.co"), "https://db.example.supabase.co")
-
-    def test_preserves_existing_http(self):
-        self.assertEqual(_ensure_https("http://localhost:54321"), "http://localhost:54321")
-
-    def test_handles_empty_string(self):
-        self.assertEqual(_ensure_https(""), "")
+    def test_ensure_https(self):
+        cases = [
+            ("adds_https_prefix", "db.example.supabase.co", "https://db.example.supabase.co"),
+            ("preserves_https", "https://db.example.supabase.co", "https://db.example.supabase.co"),
+            ("preserves_http", "http://localhost:54321", "http://localhost:54321"),
+            ("empty_string", "", ""),
+        ]
+        for label, value, expected in cases:
+            with self.subTest(label):
+                self.assertEqual(_ensure_https(value), expected)
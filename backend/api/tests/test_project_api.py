@@ -1,28 +1,50 @@
+import copy
 from unittest.mock import Mock, patch
 
 from django.core.exceptions import ValidationError as DjangoValidationError
-from django.test import TestCase, override_settings
+from django.test import SimpleTestCase, TestCase, override_settings
 from rest_framework.test import APIClient
 
 from api.models import Profile, Project
 
 
-class ProjectApiTests(TestCase):
-    def setUp(self):
-        self.client = APIClient()
-        self.auth_headers = {"HTTP_AUTHORIZATION": "Bearer unit-test-token"}
-        self.claims = {
-            "sub": "user_123",
-            "email": "owner@example.com",
-            "given_name": "Owner",
-            "family_name": "User",
-            "entitlements": ["pro"],
-        }
+OWNER_CLAIMS = {
+    "sub": "user_123",
+    "email": "owner@example.com",
+    "given_name": "Owner",
+    "family_name": "User",
+    "entitlements": ["pro"],
+}
+
+
+def _make_supabase_probe_mock(rows):
+    """Build a Supabase client mock whose profile probe query chain returns ``rows``."""
+    client = Mock()
+    query = client.table.return_value.select.return_value.eq.return_value.limit.return_value
+    query.execute.return_value = Mock(data=rows)
+    return client
+
+
+class ProjectApiBaseMixin:
+    client_class = APIClient
+    auth_headers = {"HTTP_AUTHORIZATION": "Bearer unit-test-token"}
+    claims = copy.deepcopy(OWNER_CLAIMS)
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.enterClassContext(patch("api.tools.auth.authentication.decode_clerk_token", return_value=cls.claims))
 
     def _request(self, method: str, path: str, data=None):
-        with patch("api.tools.auth.authentication.decode_clerk_token", return_value=self.claims):
-            handler = getattr(self.client, method)
-            return handler(path, data=data, format="json", **self.auth_headers)
+        handler = getattr(self.client, method)
+        return handler(path, data=data, format="json", **self.auth_headers)
+
+
+class ProjectApiTests(ProjectApiBaseMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.other_profile = Profile.objects.create(clerk_user_id="user_999", email="other@example.com")
+        cls.other_project = Project.objects.create(owner=cls.other_profile, name="Other", slug="other")
 
     def test_me_endpoint_syncs_profile(self):
         response = self._request("get", "/api/me/")
@@ -46,15 +68,12 @@ class ProjectApiTests(TestCase):
         )
         self.assertEqual(create_response.status_code, 201)
 
-        own_profile = Profile.objects.get(clerk_user_id="user_123")
-        other_profile = Profile.objects.create(clerk_user_id="user_999", email="other@example.com")
-        Project.objects.create(owner=other_profile, name="Other", slug="other")
-
         list_response = self._request("get", "/api/projects/")
         self.assertEqual(list_response.status_code, 200)
         self.assertEqual(len(list_response.data), 1)
         self.assertEqual(list_response.data[0]["name"], "Ship Faster")
 
+        own_profile = Profile.objects.get(clerk_user_id=self.claims["sub"])
         own_project = Project.objects.get(owner=own_profile, slug="ship-faster")
         detail_response = self._request("get", f"/api/projects/{own_project.id}/")
         self.assertEqual(detail_response.status_code, 200)
@@ -104,36 +123,6 @@ class ProjectApiTests(TestCase):
         self.assertEqual(response.data["feature"], "pro")
         self.assertTrue(response.data["enabled"])
 
-    @override_settings(
-        AI_SIMULATOR_ENABLED=True,
-        AI_PROVIDER_CALLS_ENABLED=True,
-        OPENAI_API_KEY="sk-openai-test",
-        OPENAI_BASE_URL="https://api.openai.com/v1",
-        OPENAI_DEFAULT_MODEL="gpt-4.1-mini",
-        OPENROUTER_API_KEY="or_test_key",
-        OPENROUTER_BASE_URL="https://openrouter.ai/api/v1",
-        OPENROUTER_DEFAULT_MODEL="openai/gpt-4.1-mini",
-        OLLAMA_BASE_URL="http://127.0.0.1:11434",
-        OLLAMA_MODEL="llama3.2",
-    )
-    def test_ai_provider_endpoint_returns_env_configured_providers(self):
-        response = self._request("get", "/api/ai/providers/")
-
-        self.assertEqual(response.status_code, 200)
-        self.assertEqual(len(response.data), 4)
-        simulator = next(item for item in response.data if item["key"] == "simulator")
-        openai = next(item for item in response.data if item["key"] == "openai")
-        openrouter = next(item for item in response.data if item["key"] == "openrouter")
-        ollama = next(item for item in response.data if item["key"] == "ollama")
-        self.assertTrue(simulator["enabled"])
-        self.assertTrue(openai["enabled"])
-        self.assertEqual(openai["base_url"], "https://api.openai.com/v1")
-        self.assertTrue(openrouter["enabled"])
-        self.assertEqual(openrouter["base_url"], "https://openrouter.ai/api/v1")
-        self.assertEqual(openrouter["model_hint"], "openai/gpt-4.1-mini")
-        self.assertTrue(ollama["enabled"])
-        self.assertEqual(ollama["base_url"], "http://127.0.0.1:11434")
-
     def test_ai_usage_summary_returns_buckets(self):
         response = self._request("get", "/api/ai/usage/summary/")
 
@@ -156,11 +145,7 @@ class ProjectApiTests(TestCase):
     )
     @patch("api.views_modules.common.get_supabase_client")
     def test_supabase_profile_probe_returns_profile_when_query_succeeds(self, mock_get_supabase_client):
-        result = Mock()
-        result.data = [{"id": 1, "clerk_user_id": "user_123"}]
-        supabase = Mock()
-        supabase.table.return_value.select.return_value.eq.return_value.limit.return_value.execute.return_value = result
-        mock_get_supabase_client.return_value = supabase
+        mock_get_supabase_client.return_value = _make_supabase_probe_mock([{"id": 1, "clerk_user_id": "user_123"}])
 
         response = self._request("get", "/api/supabase/profile/")
 
@@ -189,17 +174,13 @@ class ProjectApiTests(TestCase):
         self.assertTrue(response.data["sent"])
         self.assertEqual(response.data["recipient_email"], "owner@example.com")
 
-        profile = Profile.objects.get(clerk_user_id="user_123")
-        account = profile.customer_account
+        account = Profile.objects.select_related("customer_account").get(clerk_user_id="user_123").customer_account
         self.assertIn("preflight_email_last_sent_at", account.metadata)
         self.assertEqual(account.metadata.get("preflight_email_last_recipient"), "owner@example.com")
         mock_send_preflight.assert_called_once_with(account)
 
     def test_cannot_access_other_users_project(self):
-        other_profile = Profile.objects.create(clerk_user_id="user_999", email="other@example.com")
-        other_project = Project.objects.create(owner=other_profile, name="Other", slug="other")
-
-        response = self._request("get", f"/api/projects/{other_project.id}/")
+        response = self._request("get", f"/api/projects/{self.other_project.id}/")
         self.assertEqual(response.status_code, 404)
 
 
@@ -209,3 +190,37 @@ class ProjectModelValidationTests(TestCase):
 
         with self.assertRaises(DjangoValidationError):
             Project.objects.create(owner=owner, name="   ", slug="")
+
+
+class AiProviderApiTests(ProjectApiBaseMixin, SimpleTestCase):
+    """Settings-only AI provider endpoints; SimpleTestCase fails fast if they start querying the database."""
+
+    @override_settings(
+        AI_SIMULATOR_ENABLED=True,
+        AI_PROVIDER_CALLS_ENABLED=True,
+        OPENAI_API_KEY="sk-openai-test",
+        OPENAI_BASE_URL="https://api.openai.com/v1",
+        OPENAI_DEFAULT_MODEL="gpt-4.1-mini",
+        OPENROUTER_API_KEY="or_test_key",
+        OPENROUTER_BASE_URL="https://openrouter.ai/api/v1",
+        OPENROUTER_DEFAULT_MODEL="openai/gpt-4.1-mini",
+        OLLAMA_BASE_URL="http://127.0.0.1:11434",
+        OLLAMA_MODEL="llama3.2",
+    )
+    def test_ai_provider_endpoint_returns_env_configured_providers(self):
+        response = self._request("get", "/api/ai/providers/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data), 4)
+        simulator = next(item for item in response.data if item["key"] == "simulator")
+        openai = next(item for item in response.data if item["key"] == "openai")
+        openrouter = next(item for item in response.data if item["key"] == "openrouter")
+        ollama = next(item for item in response.data if item["key"] == "ollama")
+        self.assertTrue(simulator["enabled"])
+        self.assertTrue(openai["enabled"])
+        self.assertEqual(openai["base_url"], "https://api.openai.com/v1")
+        self.assertTrue(openrouter["enabled"])
+        self.assertEqual(openrouter["base_url"], "https://openrouter.ai/api/v1")
+        self.assertEqual(openrouter["model_hint"], "openai/gpt-4.1-mini")
+        self.assertTrue(ollama["enabled"])
+        self.assertEqual(ollama["base_url"], "http://127.0.0.1:11434")
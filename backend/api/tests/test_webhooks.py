@@ -1,7 +1,9 @@
-import json
+import logging
+from datetime import datetime, timezone
 from unittest.mock import patch
 
 from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from svix.webhooks import Webhook
 
 from api.models import CustomerAccount, Price, Product, Profile, Subscription
 from api.webhooks import (
@@ -14,13 +16,27 @@ from api.webhooks import (
     handle_user_deleted,
 )
 from api.webhooks.helpers import _extract_clerk_user_id_from_subscription_payload
+from api.webhooks.verification import _build_webhook_verifier
 
 
+def setUpModule():
+    logging.disable(logging.CRITICAL)
+
+
+def tearDownModule():
+    logging.disable(logging.NOTSET)
+
+
+@override_settings(CLERK_WEBHOOK_SIGNING_SECRET="whsec_test123")
 class ClerkWebhookViewTests(SimpleTestCase):
-    def setUp(self):
-        self.factory = RequestFactory()
+    valid_webhook_body = b'{"type": "user.created"}'
+    svix_headers = {"HTTP_SVIX_ID": "msg_123", "HTTP_SVIX_TIMESTAMP": "1234567890"}
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.factory = RequestFactory()
 
-    @override_settings(CLERK_WEBHOOK_SIGNING_SECRET="whsec_test123")
     @patch("api.webhooks.receiver.EVENT_HANDLERS", {"user.created": lambda data: None})
     @patch("api.webhooks.receiver._verify_webhook")
     def test_valid_webhook_event(self, mock_verify):
@@ -30,16 +46,14 @@ class ClerkWebhookViewTests(SimpleTestCase):
         }
         request = self.factory.post(
             "/api/webhooks/clerk/",
-            data=json.dumps({"type": "user.created"}),
+            data=self.valid_webhook_body,
             content_type="application/json",
-            HTTP_SVIX_ID="msg_123",
-            HTTP_SVIX_TIMESTAMP="1234567890",
             HTTP_SVIX_SIGNATURE="v1,test",
+            **self.svix_headers,
         )
         response = ClerkWebhookView.as_view()(request)
         self.assertEqual(response.status_code, 200)
 
-    @override_settings(CLERK_WEBHOOK_SIGNING_SECRET="whsec_test123")
     @patch("api.webhooks.receiver._verify_webhook")
     def test_invalid_webhook_signature(self, mock_verify):
         mock_verify.side_effect = WebhookVerificationError("Bad signature")
@@ -47,13 +61,30 @@ class ClerkWebhookViewTests(SimpleTestCase):
             "/api/webhooks/clerk/",
             data=b"{}",
             content_type="application/json",
-            HTTP_SVIX_ID="msg_123",
-            HTTP_SVIX_TIMESTAMP="1234567890",
             HTTP_SVIX_SIGNATURE="v1,bad",
+            **self.svix_headers,
         )
         response = ClerkWebhookView.as_view()(request)
         self.assertEqual(response.status_code, 400)
 
+    @override_settings(CLERK_WEBHOOK_SIGNING_SECRET="whsec_MfKQ9r8GKYqrTwjUPD8ILPZIo2LaLaSw")
+    def test_verify_webhook_reuses_verifier_for_signed_payloads(self):
+        timestamp = datetime.now(timezone.utc)
+        headers = {
+            "svix-id": "msg_signed",
+            "svix-timestamp": str(int(timestamp.timestamp())),
+            "svix-signature": Webhook("whsec_MfKQ9r8GKYqrTwjUPD8ILPZIo2LaLaSw").sign(
+                "msg_signed",
+                timestamp,
+                self.valid_webhook_body.decode(),
+            ),
+        }
+        _build_webhook_verifier.cache_clear()
+
+        self.assertEqual(_verify_webhook(self.valid_webhook_body, headers), {"type": "user.created"})
+        self.assertEqual(_verify_webhook(self.valid_webhook_body, headers), {"type": "user.created"})
+        self.assertEqual(_build_webhook_verifier.cache_info().misses, 1)
+
     @override_settings(CLERK_WEBHOOK_SIGNING_SECRET="")
     def test_missing_webhook_secret(self):
         with self.assertRaises(WebhookVerificationError):
@@ -74,6 +105,19 @@ class ClerkWebhookEventMappingTests(SimpleTestCase):
         self.assertIn("billing.subscription.canceled", EVENT_HANDLERS)
 
 
+class ClerkWebhookPayloadTests(SimpleTestCase):
+    def test_extract_subscription_user_id_from_payer_object(self):
+        payload = {
+            "id": "sub_payer_extract_1",
+            "status": "active",
+            "payer": {
+                "id": "pay_123",
+                "user_id": "user_test_4",
+            },
+        }
+        self.assertEqual(_extract_clerk_user_id_from_subscription_payload(payload), "user_test_4")
+
+
 class ClerkWebhookHandlerTests(TestCase):
     def test_handle_user_created_upserts_profile(self):
         handle_user_created(
@@ -93,11 +137,15 @@ class ClerkWebhookHandlerTests(TestCase):
             }
         )
 
-        profile = Profile.objects.get(clerk_user_id="user_test_1")
-        self.assertEqual(profile.email, "alex@example.com")
-        self.assertEqual(profile.plan_tier, Profile.PlanTier.PRO)
-        self.assertEqual(profile.billing_features, ["pro", "analytics"])
-        self.assertTrue(profile.is_active)
+        profile = (
+            Profile.objects.filter(clerk_user_id="user_test_1")
+            .values("email", "plan_tier", "billing_features", "is_active")
+            .get()
+        )
+        self.assertEqual(profile["email"], "alex@example.com")
+        self.assertEqual(profile["plan_tier"], Profile.PlanTier.PRO)
+        self.assertEqual(profile["billing_features"], ["pro", "analytics"])
+        self.assertTrue(profile["is_active"])
 
     def test_handle_user_deleted_marks_profile_inactive(self):
         profile = Profile.objects.create(
@@ -134,19 +182,8 @@ class ClerkWebhookHandlerTests(TestCase):
             }
         )
 
-        profile = Profile.objects.get(clerk_user_id="user_test_3")
-        self.assertEqual(profile.billing_features, ["pro", "ai_coach"])
-
-    def test_extract_subscription_user_id_from_payer_object(self):
-        payload = {
-            "id": "sub_payer_extract_1",
-            "status": "active",
-            "payer": {
-                "id": "pay_123",
-                "user_id": "user_test_4",
-            },
-        }
-        self.assertEqual(_extract_clerk_user_id_from_subscription_payload(payload), "user_test_4")
+        billing_features = Profile.objects.values_list("billing_features", flat=True).get(clerk_user_id="user_test_3")
+        self.assertEqual(billing_features, ["pro", "ai_coach"])
 
     def test_handle_billing_subscription_upsert_uses_payer_user_id(self):
         owner = Profile.objects.create(clerk_user_id="seller_subscription_1", email="seller-sub-1@example.com")
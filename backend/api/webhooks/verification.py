@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from functools import lru_cache
 from typing import Any
 
 from django.conf import settings
@@ -9,12 +10,9 @@ class WebhookVerificationError(RuntimeError):
     pass
 
 
-def _verify_webhook(payload: bytes, headers: dict[str, str]) -> dict[str, Any]:
-    """Verify the Svix signature and return the parsed event payload."""
-    signing_secret = getattr(settings, "CLERK_WEBHOOK_SIGNING_SECRET", "")
-    if not signing_secret:
-        raise WebhookVerificationError("CLERK_WEBHOOK_SIGNING_SECRET is not configured.")
-
+@lru_cache(maxsize=2)
+def _build_webhook_verifier(signing_secret: str):
+    """Decode the signing secret once and reuse the verifier across requests."""
     try:
         from svix.webhooks import Webhook
     except ImportError as exc:
@@ -23,7 +21,16 @@ def _verify_webhook(payload: bytes, headers: dict[str, str]) -> dict[str, Any]:
             "Run: pip install svix"
         ) from exc
 
-    wh = Webhook(signing_secret)
+    return Webhook(signing_secret)
+
+
+def _verify_webhook(payload: bytes, headers: dict[str, str]) -> dict[str, Any]:
+    """Verify the Svix signature and return the parsed event payload."""
+    signing_secret = getattr(settings, "CLERK_WEBHOOK_SIGNING_SECRET", "")
+    if not signing_secret:
+        raise WebhookVerificationError("CLERK_WEBHOOK_SIGNING_SECRET is not configured.")
+
+    wh = _build_webhook_verifier(signing_secret)
     try:
         event = wh.verify(payload, headers)
     except Exception as exc: